@@ -1,16 +1,54 @@
 import os
 import datetime
-from typing import List
+import itertools
+from typing import List, Set
 
-from sqlalchemy import create_engine, Column, Integer, String
-from sqlalchemy import DateTime, ForeignKey, Text, Boolean, desc
+from sqlalchemy import create_engine, event, Column, Integer, String
+from sqlalchemy import DateTime, ForeignKey, Text, Boolean, Index, desc, insert, update
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, make_transient_to_detached
 
 from custom_exceptions import MissingCredentialsException
 
 Base = declarative_base()
 
+# Maximum number of rows sent to the database in a single bulk INSERT
+INSERT_BATCH_SIZE = 1000
+
+# Indexes created by earlier versions that nothing queries through any more.
+# SQLite keeps updating an index on every write until it is dropped
+DROPPED_INDEXES = (
+    'ix_rss_feed_entry_emailed_posted',
+)
+
+# Applied to every new SQLite connection. WAL with synchronous=NORMAL only
+# syncs on checkpoints instead of twice per commit, and lets readers run
+# alongside the writer
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA cache_size=-64000',
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Runs SQLITE_PRAGMAS on a newly opened DBAPI connection.
+
+    Args:
+        dbapi_connection: The sqlite3 connection that was just opened.
+        connection_record: The connection pool record for the connection (unused).
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
 class RSSFeed(Base):
     """
     Represents an RSS feed as a SQL Alchemy ORM class.
@@ -64,6 +102,12 @@ class RSSFeedEntry(Base):
     rss_feed_id = Column(Integer, ForeignKey('rss_feed.id'), nullable=False)
     rss_feed = relationship("RSSFeed", back_populates="feed_entries")
 
+# The unique constraint on url already gives SQLite an index for the "seen?"
+# lookups. This partial index only holds the handful of entries that haven't
+# been emailed yet, already in get_unemailed_entries' ORDER BY order
+Index('ix_unemailed', RSSFeedEntry.posted_on_timestamp.desc(),
+      sqlite_where=(RSSFeedEntry.emailed == False))
+
 
 class Database():
     """
@@ -90,9 +134,22 @@ class Database():
          # Create an SQLite engine
         self._engine = create_engine(f'sqlite:///{self._path}')
 
+        event.listen(self._engine, 'connect', _set_sqlite_pragmas)
+
         Base.metadata.create_all(self._engine)
 
-        Session = sessionmaker(bind=self._engine)
+        # create_all skips tables that already exist, so add any indexes
+        # missing from databases created by an older version
+        for index in RSSFeedEntry.__table__.indexes:
+            index.create(self._engine, checkfirst=True)
+
+        with self._engine.begin() as connection:
+            for index_name in DROPPED_INDEXES:
+                connection.exec_driver_sql(f'DROP INDEX IF EXISTS {index_name}')
+
+        # The session lives as long as the scraper, so don't re-load every object after
+        # each commit or flush pending changes behind the back of a query
+        Session = sessionmaker(bind=self._engine, expire_on_commit=False, autoflush=False)
 
         self._session = Session()
 
@@ -105,6 +162,16 @@ class Database():
         """
         self._session.commit()
 
+    def commit(self):
+        """
+        Commits the changes made by update_entries_emailed and update_feed_last_checked,
+        which are left pending so several updates can share a single transaction.
+
+        Raises:
+            SQLAlchemyError: If there is an error committing the transaction.
+        """
+        self._commit()
+
     def get_all_feeds(self) -> List[RSSFeed]:
         """
         Retrieves all RSS feeds from the database.
@@ -131,9 +198,31 @@ class Database():
         feed_entries = self._session.query(RSSFeedEntry).all()
         return feed_entries
 
+    def get_existing_entry_urls(self, urls: List[str]) -> Set[str]:
+        """
+        Retrieves which of the given URLs already belong to an RSS feed entry
+        in the database.
+
+        Args:
+            urls: A list of RSS feed entry URLs to look up.
+
+        Returns:
+            A set of the given URLs that are already stored in the database.
+
+        Raises:
+            SQLAlchemyError: If there is an error querying the database.
+        """
+        if not urls:
+            return set()
+
+        existing_urls = {url for (url,) in self._session.query(RSSFeedEntry.url).filter(
+            RSSFeedEntry.url.in_(urls))}
+        return existing_urls
+
     def insert_entries(self, entries: List[RSSFeedEntry]):
         """
-        Inserts multiple RSS feed entries into the database.
+        Inserts multiple RSS feed entries into the database. The entries are given
+        their new ids and attached to the session so they can be updated afterwards.
 
         Args:
             entries: A list of RSSFeedEntry objects to be inserted.
@@ -141,13 +230,46 @@ class Database():
         Raises:
             SQLAlchemyError: If there is an error adding the entries.
         """
-        for entry in entries:
-            self._session.add(entry)
+        entries = iter(entries)
+
+        # Insert the rows in batches so each batch becomes a single multi-row INSERT
+        while True:
+            batch = list(itertools.islice(entries, INSERT_BATCH_SIZE))
+            if not batch:
+                break
+
+            mappings = [{
+                'url': entry.url,
+                'title': entry.title,
+                'posted_on_timestamp': entry.posted_on_timestamp,
+                'low_hourly': entry.low_hourly,
+                'high_hourly': entry.high_hourly,
+                'skills': entry.skills,
+                'keywords': entry.keywords,
+                'emailed': False,
+                'rss_feed_id': entry.rss_feed_id
+            } for entry in batch]
+
+            # RETURNING the url as well lets the new ids be matched back to their
+            # entries without forcing SQLite to insert the rows one at a time
+            result = self._session.execute(
+                insert(RSSFeedEntry).returning(RSSFeedEntry.id, RSSFeedEntry.url), mappings)
+            entry_ids = {url: entry_id for entry_id, url in result}
+
+            for entry in batch:
+                entry.id = entry_ids[entry.url]
+                entry.emailed = False
+
+                # Attach the entry as if it had been loaded, without issuing another INSERT
+                make_transient_to_detached(entry)
+                self._session.add(entry)
+
         self._commit()
 
     def update_entries_emailed(self, entries: List[RSSFeedEntry]):
         """
-        Marks multiple RSS feed entries as emailed in the database.
+        Marks multiple RSS feed entries as emailed in the database. The change
+        is not committed until commit() is called.
 
         Args:
             entries: A list of RSSFeedEntry objects to be updated.
@@ -155,9 +277,23 @@ class Database():
         Raises:
             SQLAlchemyError: If there is an error updating the entries.
         """
+        entry_ids = [entry.id for entry in entries]
+
+        # One UPDATE ... WHERE id IN (...) instead of one UPDATE per entry on flush
+        self._session.execute(
+            update(RSSFeedEntry).where(RSSFeedEntry.id.in_(entry_ids)).values(emailed=True))
+
+    def expunge_entries(self, entries: List[RSSFeedEntry]):
+        """
+        Removes RSS feed entries from the session so the long-lived session doesn't
+        keep every entry it has ever seen in its identity map.
+
+        Args:
+            entries: A list of RSSFeedEntry objects that are no longer needed.
+        """
         for entry in entries:
-            entry.emailed = True
-        self._commit()
+            if entry in self._session:
+                self._session.expunge(entry)
 
     def get_unemailed_entries(self) -> List[RSSFeedEntry]:
         """
@@ -175,7 +311,8 @@ class Database():
 
     def update_feed_last_checked(self, rss_feed: RSSFeed):
         """
-        Updates the last checked timestamp for an RSS feed in the database.
+        Updates the last checked timestamp for an RSS feed in the database. The
+        change is not committed until commit() is called.
 
         Args:
             rss_feed: An RSSFeed object to be updated.
@@ -185,7 +322,6 @@ class Database():
         """
         time_utc = datetime.datetime.utcnow()
         rss_feed.last_checked_timestamp = time_utc
-        self._commit()
 
     def add_feed(self, url: str) -> RSSFeed:
         """
@@ -6,6 +6,7 @@ import re
 
 from smtplib import SMTPConnectError, SMTPNotSupportedError, SMTPAuthenticationError
 from smtplib import SMTPSenderRefused, SMTPRecipientsRefused, SMTPServerDisconnected
+from smtplib import SMTPException
 
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -13,6 +14,8 @@ from email.mime.multipart import MIMEMultipart
 from custom_exceptions import MissingCredentialsException, InvalidSMTPLoginException
 from custom_exceptions import InvalidSMTPAddressException
 
+_EMAIL_RE = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+
 
 def validate_email(email: str):
     """
@@ -24,14 +27,14 @@ def validate_email(email: str):
     Returns:
         bool: True if the email address is valid, False otherwise.
     """
-    pattern = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
 
 
 class EmailAccount():
     """
     Represents an Email Account. The credentials for the email account are 
-    read from environment variables.
+    read from environment variables, and a single logged-in SMTP connection is
+    kept open and shared by every Email sent from the account.
     """
 
     def __init__(self):
@@ -39,6 +42,8 @@ class EmailAccount():
         Initialize the EmailAccount instance by reading the email credentials.
         """
 
+        self._smtp = None
+
         self._read_credentials()
 
     def _read_credentials(self):
@@ -68,6 +73,59 @@ class EmailAccount():
             raise InvalidSMTPAddressException(
                 'from_address is not a valid email address!')
 
+    def get_smtp(self) -> smtplib.SMTP:
+        """
+        Returns a logged-in SMTP connection for the account. The cached connection
+        is reused as long as it still answers a NOOP, otherwise a new one is opened.
+
+        Returns:
+            smtplib.SMTP: A connection to the SMTP server that is ready to send messages.
+
+        Raises:
+            SMTPException: If connecting, starting TLS or logging in to the SMTP server fails.
+        """
+
+        if self._smtp is not None:
+            try:
+                status, _ = self._smtp.noop()
+                if status == 250:
+                    return self._smtp
+            except SMTPServerDisconnected:
+                pass
+
+            self.close()
+
+        # Establish a connection to the SMTP server
+        server = smtplib.SMTP(self.server, self.port)
+
+        try:
+            # Start TLS encryption
+            server.starttls()
+
+            # Login to the email account
+            server.login(self.from_address, self.password)
+        except Exception:
+            server.close()
+            raise
+
+        self._smtp = server
+        return server
+
+    def close(self):
+        """
+        Closes the cached SMTP connection, if there is one.
+        """
+
+        if self._smtp is None:
+            return
+
+        try:
+            self._smtp.quit()
+        except SMTPException:
+            self._smtp.close()
+        finally:
+            self._smtp = None
+
 
 class Email():
     """
@@ -101,8 +159,8 @@ class Email():
 
     def send(self):
         """
-        Sends the email using the given EmailAccount. Exceptions are raised if there
-        are issues connecting to the SMTP server or sending the email.
+        Sends the email over the given EmailAccount's SMTP connection. Exceptions are
+        raised if there are issues connecting to the SMTP server or sending the email.
 
         Raises:
             InvalidSMTPLoginException: If there are issues authenticating with the SMTP server.
@@ -119,17 +177,16 @@ class Email():
         msg.attach(MIMEText(self._body, 'html'))
 
         try:
-            # Establish a connection to the SMTP server
-            with smtplib.SMTP(self._email_account.server, self._email_account.port) as server:
-                # Start TLS encryption
-                server.starttls()
-
-                # Login to the email account
-                server.login(self._email_account.from_address,
-                             self._email_account.password)
+            # Reuse the account's connection to the SMTP server
+            server = self._email_account.get_smtp()
 
+            try:
                 # Send the email
                 server.send_message(msg)
+            except SMTPServerDisconnected:
+                # The server dropped the connection since it was last checked, reconnect once
+                server = self._email_account.get_smtp()
+                server.send_message(msg)
         except (SMTPNotSupportedError, SMTPAuthenticationError) as exc:
             raise InvalidSMTPLoginException(
                 'Unable to connect/authenticate to SMTP server') from exc
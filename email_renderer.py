@@ -1,6 +1,18 @@
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 from database import RSSFeedEntry
 
+# Create the Jinja2 environment once so the template is only read and compiled
+# on first use, the bytecode cache also skips compilation across restarts
+_ENV = Environment(loader=FileSystemLoader('./templates'),
+                   bytecode_cache=FileSystemBytecodeCache(),
+                   auto_reload=False, cache_size=-1)
+
+# Define the template file
+_TEMPLATE_NAME = 'email_template.html'
+
+# Define the data
+_RSS_FEED_TITLE = "My Upwork RSS Feed"
+
 
 def render_html(entries: RSSFeedEntry) -> str:
     """
@@ -12,18 +24,12 @@ def render_html(entries: RSSFeedEntry) -> str:
       email_content: a string containing the email content in HTML format
     """
 
-    # Create the Jinja2 environment
-    env = Environment(loader=FileSystemLoader('./templates'))
-
-    # Define the template file
-    template = env.get_template('email_template.html')
-
-    # Define the data
-    rss_feed_title = "My Upwork RSS Feed"
+    # Served from the environment's cache after the first call
+    template = _ENV.get_template(_TEMPLATE_NAME)
 
     # Render the template with the data
     email_content = template.render(
-        entries=entries, rss_feed_title=rss_feed_title)
+        entries=entries, rss_feed_title=_RSS_FEED_TITLE)
 
     # Return the email content in HTML format
     return email_content
@@ -0,0 +1,50 @@
+from typing import List, Union
+
+from lxml import etree
+
+from custom_exceptions import RSSFeedException
+
+# Never resolve entities or fetch external resources named by the feed
+_PARSER = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=False)
+
+# Used when the feed was already decoded to a str, the declared encoding no longer applies
+_UTF8_PARSER = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=False,
+                               encoding='utf-8')
+
+
+def parse(xml: Union[bytes, str]) -> List[dict]:
+    """
+    Parses an RSS 2.0 feed with the fixed layout used by Upwork into a list of entries.
+
+    Each entry is a dict with the same keys feedparser uses for the fields we read:
+    'title', 'link', 'summary' (the item's description) and 'published'.
+
+    Args:
+        xml (Union[bytes, str]): The raw RSS document.
+
+    Returns:
+        List[dict]: One dict per <item> in the feed, in document order.
+
+    Raises:
+        RSSFeedException: If the document is not well-formed XML or is not an RSS feed.
+    """
+
+    try:
+        if isinstance(xml, str):
+            root = etree.fromstring(xml.encode('utf-8'), _UTF8_PARSER)
+        else:
+            root = etree.fromstring(xml, _PARSER)
+    except etree.XMLSyntaxError as exc:
+        raise RSSFeedException('Feed is not well-formed XML') from exc
+
+    if root is None or root.tag != 'rss':
+        raise RSSFeedException('Feed is not an RSS 2.0 document')
+
+    entries = [{
+        'title': item.findtext('title', default='').strip(),
+        'link': item.findtext('link', default='').strip(),
+        'summary': item.findtext('description', default='').strip(),
+        'published': item.findtext('pubDate', default='').strip()
+    } for item in root.iter('item')]
+
+    return entries
@@ -1,14 +1,15 @@
 from typing import List, Tuple, Optional
 from datetime import timedelta
 
-import os
-import time
 import logging
 import datetime
+import heapq
 import asyncio
 import aiohttp
 import feedparser
 
+import fast_rss
+
 from custom_exceptions import RSSFeedException
 
 from database import Database, RSSFeed, RSSFeedEntry
@@ -16,8 +17,11 @@ from database import Database, RSSFeed, RSSFeedEntry
 from email_renderer import render_html
 from email_handler import EmailAccount, Email
 
-from language_processor import NaturalLanguageExtractor, get_posted_on_timestamp
-from language_processor import get_skills, get_hourly_range, clean_html_text
+from language_processor import NaturalLanguageExtractor, parse_summaries, clean_html_text
+from language_processor import extract_keywords_batch, shutdown_keywords_pool
+
+# Appended by Upwork to the end of every RSS Entry title
+UPWORK_TITLE_SUFFIX = ' - Upwork'
 
 
 class FeedManager():
@@ -39,9 +43,11 @@ class FeedManager():
         _extract_keywords (bool): Whether to extract keywords from feed entries.
         _wait_seconds (int): The time to wait between each feed check.
         _feeds (list): The list of all RSS feeds.
-        _existing_feed_urls (set): The set of all URLs from previously processed feed entries.
-        _nlp (NaturalLanguageExtractor): A natural language processing utility for keyword extraction.
+        _feed_schedule (list): A min-heap of (next check time, feed id, feed) for all RSS feeds.
+        _unemailed_entries (list): The feed entries inserted since the last update email.
         _email_account (EmailAccount): An email account used to send email updates.
+        _http_session (aiohttp.ClientSession): The HTTP session shared by all feed fetches.
+        _process_lock (asyncio.Lock): Keeps feeds from processing their new entries at the same time.
     """
 
     def __init__(self, db: Database, to_address: str,
@@ -65,26 +71,69 @@ class FeedManager():
 
         self._feeds = []
 
-        self._existing_feed_urls = set()
+        self._feed_schedule = []
+
+        self._unemailed_entries = []
+
+        # Created lazily like the HTTP session, so it belongs to the loop that runs the feeds
+        self._process_lock = None
 
+        # Load the keyword extractor up front so the first batch of entries isn't held up
         if self._extract_keywords:
-            self._nlp = NaturalLanguageExtractor()
+            NaturalLanguageExtractor.instance()
 
         self._email_account = EmailAccount()
 
+        # Created lazily since aiohttp sessions must be created inside the event loop
+        self._http_session = None
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._http_session is None or self._http_session.closed:
+            # One pooled session for every feed so connections and TLS sessions
+            # to upwork.com are reused between fetches
+            connector = aiohttp.TCPConnector(limit=64, ttl_dns_cache=300, keepalive_timeout=60)
+            self._http_session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=30))
+
+        return self._http_session
+
+    def _ensure_process_lock(self) -> asyncio.Lock:
+        if self._process_lock is None:
+            # Held from the duplicate check until the insert, since feeds processed at the
+            # same time may share entries and keyword extraction gives up the event loop
+            self._process_lock = asyncio.Lock()
+
+        return self._process_lock
+
+    async def close(self):
+        """
+        Close the shared HTTP session, the email account's SMTP connection and any
+        keyword extraction worker processes.
+        """
+
+        if self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
+
+        self._email_account.close()
+
+        shutdown_keywords_pool()
+
     def _load_existing_feeds(self):
 
         # Load all feeds from the database
         feeds = self._db.get_all_feeds()
 
-        # Load all feed entries from the database
-        feed_entries = self._db.get_all_feed_entries()
+        self._feeds = feeds
+
+        for rss_feed in feeds:
+            self._schedule_feed(rss_feed)
 
-        # Mark each of the feed entries urls as already scraped so we don't do duplicates
-        for feed_entry in feed_entries:
-            self._existing_feed_urls.add(feed_entry.url)
+    def _schedule_feed(self, rss_feed: RSSFeed):
 
-        self._feeds = feeds
+        # The feed id breaks ties so feeds due at the same time are never compared
+        next_check = rss_feed.last_checked_timestamp + timedelta(seconds=self._wait_seconds)
+        heapq.heappush(self._feed_schedule, (next_check, rss_feed.id, rss_feed))
 
     async def add_new_feed(self, url: str):
         """
@@ -105,22 +154,27 @@ class FeedManager():
 
         # Append the RSS feed to the list of feeds
         self._feeds.append(rss_feed)
+        self._schedule_feed(rss_feed)
 
         # Process the fetched entries
-        self._process_entries(rss_feed, entries)
+        await self._process_entries(rss_feed, entries)
 
     async def _get_entries(self, url: str, first_fetch: Optional[bool] = False) -> list:
 
         # Fetch HTTP response from the RSS feed
-        response_text = await self._fetch_entries_http(url)
+        response_body = await self._fetch_entries_http(url)
 
-        if not response_text and first_fetch:
+        if not response_body and first_fetch:
             raise RSSFeedException(
                 f'Failed to fetch entries from {url} or no entries found.')
 
-        parsed_feed = feedparser.parse(response_text)
+        # The fetch already logged why it failed, try again on the next check
+        if not response_body:
+            return []
 
-        entries = parsed_feed.entries
+        # Parse in a worker thread so the event loop can keep scheduling the other feeds' fetches
+        loop = asyncio.get_running_loop()
+        entries = await loop.run_in_executor(None, self._parse_entries, response_body)
 
         if len(entries) < 1 and first_fetch:
             raise RSSFeedException(
@@ -128,26 +182,68 @@ class FeedManager():
 
         return entries
 
-    def _process_entries(self, source: RSSFeed, entries: list):
+    @staticmethod
+    def _parse_entries(response_body: bytes) -> list:
+
+        # Upwork feeds have a fixed RSS layout, so the lxml parser handles them much
+        # faster than feedparser, which is only needed for anything unexpected
+        try:
+            return fast_rss.parse(response_body)
+        except RSSFeedException as exc:
+            logging.warning("Falling back to feedparser: %s", exc)
+            return feedparser.parse(response_body).entries
+
+    async def _process_entries(self, source: RSSFeed, entries: list):
 
         if entries is None:
             return
 
+        async with self._ensure_process_lock():
+            await self._process_new_entries(source, entries)
+
+    async def _process_new_entries(self, source: RSSFeed, entries: list):
+
+        # Ask the database which of these urls were already scraped so we don't do duplicates
+        urls = {entry['link'] for entry in entries}
+        new_urls = urls - self._db.get_existing_entry_urls(list(urls))
+
+        # Keyed by url so a link repeated within the feed is only processed once
+        new_entries = list({entry['link']: entry for entry in entries
+                            if entry['link'] in new_urls}.values())
+
+        if len(new_entries) < 1:
+            return
+
+        # Work column by column so each extraction step runs as one tight loop over the batch
+        urls = [entry['link'] for entry in new_entries]
+        titles, html_summaries, summaries = zip(
+            *[self._extract_and_clean_data(entry) for entry in new_entries])
+
+        # One scan over the whole batch pulls out the hourly range, skills and posted on timestamps
+        parsed_summaries = parse_summaries(list(html_summaries))
+        keywords = await self._get_keywords_batch(summaries)
+
+        # Reference the feed by id rather than through the relationship so the
+        # entries aren't cascaded into the session before the bulk insert
         processed_entries = []
 
-        for entry in entries:
-            processed_entry = self._process_single_entry(entry, source)
-            if processed_entry is not None:
-                processed_entries.append(processed_entry)
+        for url, title, parsed_summary, entry_keywords in zip(
+                urls, titles, parsed_summaries, keywords):
+            processed_entries.append(RSSFeedEntry(
+                url=url, rss_feed_id=source.id,
+                posted_on_timestamp=self._to_naive_utc(parsed_summary['posted_on_timestamp']),
+                low_hourly=parsed_summary['low_hourly'],
+                high_hourly=parsed_summary['high_hourly'],
+                skills=parsed_summary['skills'], title=title, keywords=entry_keywords))
 
-        self._add_entries_to_db_and_existing_urls(processed_entries)
+        self._add_entries_to_db(processed_entries)
 
     def _extract_and_clean_data(self, entry: dict) -> Tuple[str, str]:
         title = entry['title']
 
-        # Remove the '- Upwork' string that's in the RSS Entry title
-        if '- Upwork' in title:
-            title = title.replace('- Upwork', '').strip()
+        # Slice the suffix off instead of searching and replacing across the whole title
+        if title.endswith(UPWORK_TITLE_SUFFIX):
+            title = title[:-len(UPWORK_TITLE_SUFFIX)]
 
         title = clean_html_text(title)
 
@@ -156,69 +252,75 @@ class FeedManager():
 
         return title, html_summary, summary
 
-    def _add_entries_to_db_and_existing_urls(self, processed_entries: list):
+    def _add_entries_to_db(self, processed_entries: list):
         if len(processed_entries) > 0:
             self._db.insert_entries(processed_entries)
 
-        for processed_entry in processed_entries:
-            self._existing_feed_urls.add(processed_entry.url)
+        # Keep the new entries around so the next email doesn't need to query for them
+        self._unemailed_entries.extend(processed_entries)
 
-    def _process_single_entry(self, entry: dict, source: RSSFeed) -> Optional[RSSFeedEntry]:
-        url = entry['link']
+    @staticmethod
+    def _to_naive_utc(timestamp: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
 
-        # If we already scraped this url, skip it
-        if url in self._existing_feed_urls:
+        # Stored naive like the rest of the table (SQLite drops the timezone) so new
+        # entries can be compared with the ones loaded from the database
+        if timestamp is None:
             return None
 
-        title, html_summary, summary = self._extract_and_clean_data(entry)
+        return timestamp.replace(tzinfo=None)
 
-        posted_on_timestamp = get_posted_on_timestamp(html_summary)
-        low_hourly, high_hourly = get_hourly_range(html_summary)
-        skills = get_skills(html_summary)
+    async def _get_keywords_batch(self, summaries: List[str]) -> List[str]:
 
-        if self._extract_keywords:
-            keywords_ls = self._nlp.extract_keywords(summary)
-            keywords = ', '.join(keyword for keyword in keywords_ls)
-        else:
-            keywords = ''
+        if not self._extract_keywords:
+            return [''] * len(summaries)
 
-        processed_entry = RSSFeedEntry(url=url, rss_feed=source,
-                                       posted_on_timestamp=posted_on_timestamp,
-                                       low_hourly=low_hourly, high_hourly=high_hourly,
-                                       skills=skills, title=title, keywords=keywords)
-        return processed_entry
+        # Wait on the extraction from a thread so other feeds can be fetched in the meantime
+        loop = asyncio.get_running_loop()
+        batch_keywords = await loop.run_in_executor(None, extract_keywords_batch, list(summaries))
 
-    def _get_time_ago_string(self, date_utc: datetime.datetime) -> str:
-        # Get the current UTC time
-        current_utc = datetime.datetime.utcnow()
+        return [', '.join(keywords) for keywords in batch_keywords]
 
-        # Calculate the time difference
-        time_diff = current_utc - date_utc
-
-        # Convert time difference to minutes, hours, or days
-        if time_diff < timedelta(minutes=1):
-            time_ago = "just now"
-        elif time_diff < timedelta(hours=1):
-            minutes = int(time_diff.total_seconds() / 60)
-            time_ago = f"{minutes} minute{'s' if minutes > 1 else ''} ago"
-        elif time_diff < timedelta(days=1):
-            hours = int(time_diff.total_seconds() / 3600)
-            time_ago = f"{hours} hour{'s' if hours > 1 else ''} ago"
+    def _get_time_ago_string(self, minutes_ago: int) -> str:
+
+        # Convert the whole minutes elapsed to minutes, hours, or days
+        if minutes_ago < 1:
+            return "just now"
+
+        if minutes_ago < 60:
+            count, unit = minutes_ago, 'minute'
+        elif minutes_ago < 60 * 24:
+            count, unit = minutes_ago // 60, 'hour'
         else:
-            days = time_diff.days
-            time_ago = f"{days} day{'s' if days > 1 else ''} ago"
+            count, unit = minutes_ago // (60 * 24), 'day'
 
-        return time_ago
+        return f"{count} {unit}{'s' if count > 1 else ''} ago"
 
     def _send_email(self, processed_entries: List[RSSFeedEntry]):
 
         if len(processed_entries) < 1:
             return
 
+        # Newest entries first
+        processed_entries = sorted(processed_entries,
+                                   key=lambda entry: entry.posted_on_timestamp, reverse=True)
+
+        # Get the current UTC time once for the whole batch
+        current_utc = datetime.datetime.utcnow()
+
+        # Entries posted in the same minute share a string, so only format each once
+        time_ago_strings = {}
+
         # Adds a new 'time ago' attribute for HTML rendering
         for processed_entry in processed_entries:
-            processed_entry.time_ago = self._get_time_ago_string(
-                processed_entry.posted_on_timestamp)
+            time_diff = current_utc - processed_entry.posted_on_timestamp
+            minutes_ago = int(time_diff.total_seconds() // 60)
+
+            time_ago = time_ago_strings.get(minutes_ago)
+            if time_ago is None:
+                time_ago = self._get_time_ago_string(minutes_ago)
+                time_ago_strings[minutes_ago] = time_ago
+
+            processed_entry.time_ago = time_ago
 
         email_content = render_html(processed_entries)
 
@@ -231,35 +333,38 @@ class FeedManager():
 
         self._db.update_entries_emailed(processed_entries)
 
-    async def _fetch_entries_http(self, feed_url: str) -> str:
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(feed_url) as response:
-                    response.raise_for_status()
-                    return await response.text()
-
-            except aiohttp.ClientConnectionError as exc:
-                logging.error("Connection error to %s: %s", feed_url, exc)
-                return None
-            except aiohttp.ClientPayloadError as exc:
-                logging.error("Payload error from %s: %s", feed_url, exc)
-                return None
-            except aiohttp.ClientResponseError as exc:
-                logging.error("Response error from %s: %s", feed_url, exc)
-                return None
-            except aiohttp.ClientError as exc:
-                logging.error(
-                    "General client error fetching feed from %s: %s", feed_url, exc)
-                return None
-            except asyncio.TimeoutError as exc:
-                logging.error(
-                    "Timeout error fetching feed from %s: %s", feed_url, exc)
-                return None
+    async def _fetch_entries_http(self, feed_url: str) -> Optional[bytes]:
+        session = await self._ensure_session()
+
+        try:
+            async with session.get(feed_url) as response:
+                response.raise_for_status()
+                # Hand the raw bytes to the parser, which decodes them using the XML
+                # declaration instead of aiohttp guessing a charset and copying to a str
+                return await response.read()
+
+        except aiohttp.ClientConnectionError as exc:
+            logging.error("Connection error to %s: %s", feed_url, exc)
+            return None
+        except aiohttp.ClientPayloadError as exc:
+            logging.error("Payload error from %s: %s", feed_url, exc)
+            return None
+        except aiohttp.ClientResponseError as exc:
+            logging.error("Response error from %s: %s", feed_url, exc)
+            return None
+        except aiohttp.ClientError as exc:
+            logging.error(
+                "General client error fetching feed from %s: %s", feed_url, exc)
+            return None
+        except asyncio.TimeoutError as exc:
+            logging.error(
+                "Timeout error fetching feed from %s: %s", feed_url, exc)
+            return None
 
     async def _get_and_process_feed(self, rss_feed: RSSFeed):
         entries = await self._get_entries(rss_feed.url)
 
-        self._process_entries(rss_feed, entries)
+        await self._process_entries(rss_feed, entries)
 
         self._db.update_feed_last_checked(rss_feed)
 
@@ -267,38 +372,49 @@ class FeedManager():
         """
         Continuously loops over all available RSS feeds, fetches and processes their entries.
         This method also sends an email with entries that haven't been emailed yet.
-        It waits a certain amount of time between each loop iteration, ensuring that
+        It sleeps until the next feed is due between each loop iteration, ensuring that
         each feed is only checked after a specific interval.
         """
 
+        # Pick up entries that weren't emailed before the last shutdown, after this
+        # the new entries are tracked as they're inserted
+        self._unemailed_entries = self._db.get_unemailed_entries()
+
         while True:
-            # Go through all feeds, fetch and process the entries
+            # Take every feed that's due off the schedule, fetch and process the entries
 
             ready_feeds = []
             now_utc = datetime.datetime.utcnow()
 
-            max_wait_time = 0
-
-            for rss_feed in self._feeds:
-
-                delta = (now_utc - rss_feed.last_checked_timestamp).total_seconds()
-
-                if delta >= self._wait_seconds:
-                    ready_feeds.append(rss_feed)
-                else:
-                    wait_time = self._wait_seconds - delta
-
-                    if wait_time > max_wait_time:
-                        max_wait_time = wait_time
+            while self._feed_schedule and self._feed_schedule[0][0] <= now_utc:
+                _, _, rss_feed = heapq.heappop(self._feed_schedule)
+                ready_feeds.append(rss_feed)
 
             # Use aiohttp to asynchronously fetch RSS feeds
             await asyncio.gather(*[
                 self._get_and_process_feed(rss_feed) for rss_feed in ready_feeds])
 
-            # Get unemailed entries from the database
-            unemailed_entries = self._db.get_unemailed_entries()
+            # Their last checked timestamps were just updated, so put them back in line
+            for rss_feed in ready_feeds:
+                self._schedule_feed(rss_feed)
 
             # Send email with unemailed entries
-            self._send_email(unemailed_entries)
+            emailed_entries = self._unemailed_entries
+            self._send_email(emailed_entries)
+
+            self._unemailed_entries = []
+
+            # Commit this iteration's last checked and emailed updates in one transaction
+            self._db.commit()
+
+            # Nothing needs the emailed entries anymore, keep the session's identity map small
+            self._db.expunge_entries(emailed_entries)
+
+            # Sleep until the earliest feed is due again
+            if self._feed_schedule:
+                next_check = self._feed_schedule[0][0]
+                wait_time = (next_check - datetime.datetime.utcnow()).total_seconds()
+            else:
+                wait_time = self._wait_seconds
 
-            await asyncio.sleep(max_wait_time)
+            await asyncio.sleep(max(wait_time, 0))
@@ -1,10 +1,128 @@
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+import os
+import bisect
 import datetime
+import functools
+import heapq
+import logging
+import multiprocessing
+import html
+import pickle
 import re
-import pytz
+import string
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# None of the lazy groups may cross a _SUMMARY_SEPARATOR, so for parse_summaries a
+# match never runs from one joined summary into the next. On a single summary they
+# match the same as '(.*?)' with re.DOTALL for skills and '(.*?)' for posted on
+_HOURLY_RE = re.compile(r'Hourly Range</b>: ([\$\d\.]+)-([\$\d\.]+)')
+_SKILLS_RE = re.compile(r'<b>Skills<\/b>:([^\x00]*?)<br \/>')
+_POSTED_RE = re.compile(r'<b>Posted On</b>:\s+([^\x00\n]*?)\s+UTC')
+_NONLETTERS_RE = re.compile('[^a-zA-Z]')
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+# Like html.parser, only treat '<' as opening a tag when a letter, '/', '!' or '?' follows,
+# skip '>' inside quoted attribute values and drop comments whole. CDATA sections are
+# captured so splitting on the pattern keeps their text
+_TAG_RE = re.compile(r'<!\[CDATA\[(.*?)\]\]>'
+                     r'|<!--.*?-->'
+                     r'|<[a-zA-Z/!?](?:[^>"\']|"[^"]*"|\'[^\']*\')*>', re.DOTALL)
+
+# The whitespace characters BeautifulSoup collapses in strings made up only of them
+_ASCII_SPACES = ' \n\t\x0c\r'
+
+# Joins summaries for parse_summaries, NUL is not allowed in XML so no summary contains it
+# (and unlike the ASCII separator characters it doesn't count as whitespace for \s)
+_SUMMARY_SEPARATOR = '\x00'
+
+_MONTHS = {'January': 1, 'February': 2, 'March': 3, 'April': 4, 'May': 5, 'June': 6,
+           'July': 7, 'August': 8, 'September': 9, 'October': 10, 'November': 11,
+           'December': 12}
+
+# Where the Brown Corpus word frequencies are kept between runs
+_BROWN_FREQ_CACHE_PATH = os.path.join(
+    os.path.expanduser('~'), '.cache', 'upwork_scraper', 'brown_fdist.pkl')
+
+# Words seen fewer times than this in the Brown Corpus are likely to be technical terms
+_RARE_WORD_THRESHOLD = 20
+
+# Batches smaller than this are cheaper to extract in-process than to send to the workers
+_MIN_PARALLEL_BATCH = 32
+
+# Texts handed to a worker process at a time by extract_keywords_batch
+_KEYWORDS_CHUNKSIZE = 16
+
+# Worker processes for extract_keywords_batch, started on first use
+_keywords_pool = None
+_keywords_pool_lock = threading.Lock()
+
+
+def _parse_skills(skills_str: str) -> str:
+    """
+    Normalizes the comma separated skills captured from a job summary.
+
+    Args:
+        skills_str (str): The raw text following the Skills label.
+
+    Returns:
+        str: The skills separated by ', ' with surrounding whitespace removed.
+    """
+
+    skills_final = ', '.join(skill.strip() for skill in skills_str.split(','))
+
+    return skills_final
 
-from bs4 import BeautifulSoup
+
+def _parse_posted_on(date: str) -> datetime.datetime:
+    """
+    Converts the date captured from a job summary's Posted On label to a datetime.
+
+    Args:
+        date (str): The date in the "%B %d, %Y %H:%M" format.
+
+    Returns:
+        datetime.datetime: The posted on timestamp as a datetime object in UTC timezone.
+    """
+
+    # The format never changes, so split it by hand rather than going through strptime.
+    # The shortcut is only taken when the fields have the comma and the plain ASCII digit
+    # counts the format's directives allow, so it never accepts a date strptime rejects
+    try:
+        month, day, year, hour_minute = date.split()
+        hour, minute = hour_minute.split(':')
+
+        if not (day.endswith(',') and _is_ascii_number(day[:-1], 1, 2)
+                and _is_ascii_number(year, 4, 4)
+                and _is_ascii_number(hour, 1, 2) and _is_ascii_number(minute, 1, 2)):
+            raise ValueError(f"Unexpected Posted On date: {date}")
+
+        date_utc = datetime.datetime(int(year), _MONTHS[month], int(day[:-1]),
+                                     int(hour), int(minute), tzinfo=datetime.timezone.utc)
+    except (KeyError, ValueError):
+        # Anything unexpected goes through strptime, which raises a descriptive ValueError
+        date_obj = datetime.datetime.strptime(date, "%B %d, %Y %H:%M")
+        date_utc = date_obj.replace(tzinfo=datetime.timezone.utc)
+
+    return date_utc
+
+
+def _is_ascii_number(text: str, min_digits: int, max_digits: int) -> bool:
+    """
+    Checks whether the text is made up only of ASCII digits, with a digit count in the given range.
+
+    Args:
+        text (str): The text to check.
+        min_digits (int): The fewest digits allowed.
+        max_digits (int): The most digits allowed.
+
+    Returns:
+        bool: True if the text is an ASCII number of an allowed length, False otherwise.
+    """
+
+    # str.isdigit alone also accepts other scripts' digits, which int() would happily parse
+    return min_digits <= len(text) <= max_digits and text.isascii() and text.isdigit()
 
 
 def get_hourly_range(summary: str) -> Tuple:
@@ -18,7 +136,7 @@ def get_hourly_range(summary: str) -> Tuple:
         Tuple: A tuple containing the low and high ends of the hourly range. If not found, returns (None, None).
     """
 
-    match = re.search(r'Hourly Range</b>: ([\$\d\.]+)-([\$\d\.]+)', summary)
+    match = _HOURLY_RE.search(summary)
 
     if match:
         hourly_range_low, hourly_range_high = match.groups()
@@ -38,16 +156,10 @@ def get_skills(summary: str) -> str:
         str: A string containing the skills required for the job. If not found, returns None.
     """
 
-    match = re.search(r'<b>Skills<\/b>:(.*?)<br \/>', summary, re.DOTALL)
+    match = _SKILLS_RE.search(summary)
 
     if match:
-        skills_str = match.group(1)
-
-        skills = [skill.strip() for skill in skills_str.split(',')]
-
-        skills_final = ', '.join(skill for skill in skills)
-
-        return skills_final
+        return _parse_skills(match.group(1))
 
     return None
 
@@ -64,18 +176,81 @@ def get_posted_on_timestamp(summary: str) -> datetime.datetime:
                            If no match is found, returns None.
     """
 
-    match = re.search(r'<b>Posted On</b>:\s+(.*?)\s+UTC', summary)
+    match = _POSTED_RE.search(summary)
 
     if match:
-        date = match.group(1)
+        return _parse_posted_on(match.group(1))
 
-        date_obj = datetime.datetime.strptime(date, "%B %d, %Y %H:%M")
-        utc_timezone = pytz.timezone('UTC')
-        date_utc = utc_timezone.localize(date_obj)
+    return None
 
-        return date_utc
 
-    return None
+def parse_summary(summary: str) -> Dict[str, Any]:
+    """
+    Extracts the hourly range, skills and posted on timestamp from the job summary.
+
+    Args:
+        summary (str): The job summary in HTML format.
+
+    Returns:
+        Dict[str, Any]: A dict with the 'low_hourly', 'high_hourly', 'skills' and
+                        'posted_on_timestamp' of the job, each None if not found.
+    """
+
+    # Each field is searched for on its own, a single alternation would let an
+    # unterminated Skills value swallow the fields that follow it
+    low_hourly, high_hourly = get_hourly_range(summary)
+
+    parsed = {'low_hourly': low_hourly, 'high_hourly': high_hourly,
+              'skills': get_skills(summary),
+              'posted_on_timestamp': get_posted_on_timestamp(summary)}
+
+    return parsed
+
+
+def parse_summaries(summaries: List[str]) -> List[Dict[str, Any]]:
+    """
+    Extracts the hourly range, skills and posted on timestamp from many job summaries
+    at once by scanning them joined together as a single string.
+
+    Args:
+        summaries (List[str]): The job summaries in HTML format.
+
+    Returns:
+        List[Dict[str, Any]]: One dict per summary, in the same order, like those
+                              returned by parse_summary.
+    """
+
+    parsed_summaries = [{'low_hourly': None, 'high_hourly': None,
+                         'skills': None, 'posted_on_timestamp': None} for _ in summaries]
+
+    # Offset of each summary within the joined string, used to map matches back to it
+    starts = []
+    offset = 0
+
+    for summary in summaries:
+        starts.append(offset)
+        offset += len(summary) + len(_SUMMARY_SEPARATOR)
+
+    joined = _SUMMARY_SEPARATOR.join(summaries)
+
+    # One scan per pattern rather than one alternation, so a match for one field can
+    # never consume another. Like the individual helpers only the first match counts
+    for pattern, field in ((_HOURLY_RE, 'high_hourly'), (_SKILLS_RE, 'skills'),
+                           (_POSTED_RE, 'posted_on_timestamp')):
+        for match in pattern.finditer(joined):
+            parsed = parsed_summaries[bisect.bisect_right(starts, match.start()) - 1]
+
+            if parsed[field] is not None:
+                continue
+
+            if field == 'high_hourly':
+                parsed['low_hourly'], parsed['high_hourly'] = match.groups()
+            elif field == 'skills':
+                parsed['skills'] = _parse_skills(match.group(1))
+            else:
+                parsed['posted_on_timestamp'] = _parse_posted_on(match.group(1))
+
+    return parsed_summaries
 
 
 def clean_html_text(html_text: str) -> str:
@@ -89,38 +264,125 @@ def clean_html_text(html_text: str) -> str:
         str: The cleaned plain text.
     """
 
-    soup = BeautifulSoup(html_text, 'html.parser')
-    raw_text = soup.get_text(separator=' ')
+    # Text without any tags only needs its entities decoding
+    if '<' not in html_text:
+        return _clean_text_piece(html.unescape(html_text)) if html_text else html_text
+
+    # Summaries only carry simple inline markup, so splitting on tags is enough. Joining
+    # the non-empty text pieces with a space follows BeautifulSoup's get_text(separator=' '),
+    # apart from whitespace inside <pre> and <textarea>, which it keeps as is
+    text_pieces = []
+
+    # Splitting on a pattern with a group puts the CDATA text at every odd index
+    for index, piece in enumerate(_TAG_RE.split(html_text)):
+        if not piece:
+            continue
+
+        # CDATA is kept as written, everything else has its entities decoded
+        if index % 2 == 0:
+            piece = html.unescape(piece)
+
+        text_pieces.append(_clean_text_piece(piece))
+
+    raw_text = ' '.join(text_pieces)
     return raw_text
 
 
+def _clean_text_piece(piece: str) -> str:
+
+    # Like BeautifulSoup, a non-empty piece that is only whitespace shrinks to one character
+    if not piece.strip(_ASCII_SPACES):
+        return '\n' if '\n' in piece else ' '
+
+    return piece
+
+
+@functools.lru_cache(maxsize=None)
+def _load_brown_freq() -> Dict[str, int]:
+    """
+    Loads the frequency of each word in the Brown Corpus. Counting the ~1M words is
+    only done on the first run, after that the counts are read back from a pickle,
+    and every caller in the same process shares one dict.
+
+    Returns:
+        Dict[str, int]: The number of times each word appears in the Brown Corpus.
+    """
+
+    try:
+        with open(_BROWN_FREQ_CACHE_PATH, 'rb') as cache_file:
+            return pickle.load(cache_file)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+
+    import nltk
+    from nltk.corpus import brown
+
+    # Get a list of all words in the Brown Corpus and create a frequency distribution,
+    # kept as a plain dict since lookups skip FreqDist's Counter machinery
+    freq = dict(nltk.FreqDist(brown.words()))
+
+    try:
+        os.makedirs(os.path.dirname(_BROWN_FREQ_CACHE_PATH), exist_ok=True)
+
+        # Write to a temporary file first so a concurrent reader never sees a partial pickle
+        tmp_path = f'{_BROWN_FREQ_CACHE_PATH}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as cache_file:
+            pickle.dump(freq, cache_file, protocol=5)
+        os.replace(tmp_path, _BROWN_FREQ_CACHE_PATH)
+    except OSError as exc:
+        logging.warning("Could not cache Brown Corpus frequencies: %s", exc)
+
+    return freq
+
+
 class NaturalLanguageExtractor():
     """
     NaturalLanguageExtractor is a class that provides functionality to perform keyword extraction from a given text
     using the RAKE (Rapid Automatic Keyword Extraction) algorithm. It uses the Brown Corpus from the NLTK library to
     establish a frequency distribution of words, allowing it to return the top 10 least common keywords.
 
+    The extractor is expensive to set up, use NaturalLanguageExtractor.instance() to share one per process.
+
     Attributes:
-        _fdist (nltk.FreqDist): A frequency distribution of words in the Brown Corpus
+        _freq (dict): The frequency of each word in the Brown Corpus
         _rake (rake_nltk.Rake): Instance of the Rake class from the rake_nltk library used for keyword extraction
+        _rake_lock (threading.Lock): Serializes use of _rake, which keeps state between calls
 
     Methods:
+        instance() -> NaturalLanguageExtractor: Returns the extractor shared by the whole process
         _remove_non_letters(word: str) -> str: Removes non-alphabetic characters from the given word and returns it
         extract_keywords(text: str) -> List[str]: Extracts the top 10 least common keywords from the given text
     """
 
+    _instance = None
+    _instance_lock = threading.Lock()
+
     def __init__(self):
-        import nltk
+        from nltk.corpus import stopwords
         from rake_nltk import Rake
-        from nltk.corpus import brown
 
-        # Get a list of all words in the Brown Corpus
-        words = brown.words()
+        self._freq = _load_brown_freq()
+
+        # Hand RAKE hashed sets up front so every stopword and punctuation check is a
+        # constant time lookup, whichever rake_nltk version is installed
+        self._rake = Rake(stopwords=frozenset(stopwords.words('english')),
+                          punctuations=frozenset(string.punctuation))
+        self._rake_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls) -> 'NaturalLanguageExtractor':
+        """
+        Returns the NaturalLanguageExtractor shared by the whole process, creating it on first use.
 
-        # Create a frequency distribution of words
-        self._fdist = nltk.FreqDist(words)
+        Returns:
+            NaturalLanguageExtractor: The shared extractor
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
 
-        self._rake = Rake()
+        return cls._instance
 
     @staticmethod
     def _remove_non_letters(word: str) -> str:
@@ -133,7 +395,11 @@ class NaturalLanguageExtractor():
         Returns:
             str: The word or string with only alphabetic characters
         """
-        return re.sub('[^a-zA-Z]', '', word)
+        # Most candidates are already plain ASCII words, which need no substitution at all
+        if word.isascii() and word.isalpha():
+            return word
+
+        return _NONLETTERS_RE.sub('', word)
     
     @staticmethod
     def _remove_urls(text: str) -> str:
@@ -147,8 +413,9 @@ class NaturalLanguageExtractor():
             str: The string with URLs removed
         """
 
-        url_pattern = re.compile(r'https?://\S+|www\.\S+')
-        no_url_text = url_pattern.sub(r'', text)
+        # Match anywhere rather than only at token starts, since URLs often follow
+        # punctuation like '(' or ':' without a space
+        no_url_text = _URL_RE.sub(r'', text)
         return no_url_text
 
     def extract_keywords(self, text: str) -> List[str]:
@@ -165,46 +432,122 @@ class NaturalLanguageExtractor():
         # Remove URLs from the text so they don't interfere with keyword extraction
         text = NaturalLanguageExtractor._remove_urls(text)
 
-        # Extraction given the text.
-        self._rake.extract_keywords_from_text(text)
+        # Rake keeps the last text's phrases on the instance, so guard the pair of calls
+        with self._rake_lock:
+            # Extraction given the text.
+            self._rake.extract_keywords_from_text(text)
 
-        # To get keyword phrases ranked highest to lowest.
-        key_phrases = self._rake.get_ranked_phrases()
+            # To get keyword phrases ranked highest to lowest.
+            key_phrases = self._rake.get_ranked_phrases()
 
         all_words = set()
 
+        # Bound once as locals rather than looked up again for every phrase
+        remove_non_letters = NaturalLanguageExtractor._remove_non_letters
+        add_word = all_words.add
+
         for phrase in key_phrases:
-            words = phrase.split(' ')
+            # We're not looking for key phrases, we're looking specifically
+            # for technical keywords. Checking for a space avoids splitting every phrase
+            if ' ' in phrase:
+                continue
+
+            cleaned_word = remove_non_letters(phrase)
 
-            # We're not looking for key phrases, we're looking specifically 
-            # for technical keywords
-            if len(words) != 1:
+            if not cleaned_word:
                 continue
 
-            word = words[0]
+            add_word(cleaned_word)
 
-            cleaned_word = NaturalLanguageExtractor._remove_non_letters(word)
+        freq = self._freq
 
-            if len(cleaned_word) < 1:
-                continue
+        # If frequency < 20, usually this is a rare term in the brown corpus
+        # and has a higher probability of being a technical term. Words missing
+        # from the corpus entirely count as the rarest of all
+        rare_words = (word for word in all_words if freq.get(word, 0) < _RARE_WORD_THRESHOLD)
+
+        # Get only the top 10 least common keywords, without sorting every candidate
+        return heapq.nsmallest(10, rare_words, key=lambda word: freq.get(word, 0))
 
-            all_words.add(cleaned_word)
 
-        # Get frequencies for each word
-        word_freqs = [(word, self._fdist[word]) for word in all_words]
+def _init_keywords_worker():
+    # Build the worker's extractor up front rather than during its first batch
+    NaturalLanguageExtractor.instance()
 
-        keywords = set()
 
-        for word, freq in word_freqs:
+def _extract_keywords_worker(text: str) -> List[str]:
+    return NaturalLanguageExtractor.instance().extract_keywords(text)
 
-            # If frequency < 20, usually this is a rare term in the brown corpus
-            # and has a higher probability of being a technical term
-            if freq < 20:
-                keywords.add((word, freq))
 
-        sorted_keywords = sorted(keywords, key=lambda x: x[1])
+def _get_keywords_pool() -> Optional[ProcessPoolExecutor]:
+    global _keywords_pool
+
+    with _keywords_pool_lock:
+        if _keywords_pool is None:
+            # The pool is started from inside the running scraper, which already has
+            # worker threads and open connections. Forking that could leave a child stuck
+            # on a lock held by one of those threads, so start workers from a clean server
+            try:
+                mp_context = multiprocessing.get_context('forkserver')
+            except ValueError:
+                # Not available on this platform (e.g. Windows), extract in-process instead
+                return None
+
+            # Make sure the Brown frequencies are pickled before the workers start, so
+            # each of them reads the cache instead of counting the corpus itself
+            _load_brown_freq()
+
+            _keywords_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(), initializer=_init_keywords_worker,
+                mp_context=mp_context)
+
+    return _keywords_pool
+
+
+def extract_keywords_batch(texts: List[str]) -> List[List[str]]:
+    """
+    Extracts the top 10 least common keywords from each of the given texts. Large batches
+    are spread across a pool of worker processes, since RAKE is CPU bound and the GIL
+    keeps threads from helping.
 
-        keywords_list = [keyword for keyword, _ in sorted_keywords]
+    The workers are started with the forkserver method, which imports the script that
+    launched the scraper, so that script must guard its entry point with
+    if __name__ == '__main__'. Where forkserver isn't available the batch is
+    extracted in-process.
+
+    Args:
+        texts (List[str]): The input texts from which to extract keywords
+
+    Returns:
+        List[List[str]]: The keywords of each text, in the same order as texts
+    """
+
+    pool = None
+
+    if len(texts) >= _MIN_PARALLEL_BATCH and (os.cpu_count() or 1) > 1:
+        pool = _get_keywords_pool()
+
+    if pool is None:
+        nlp = NaturalLanguageExtractor.instance()
+        return [nlp.extract_keywords(text) for text in texts]
+
+    try:
+        return list(pool.map(_extract_keywords_worker, texts, chunksize=_KEYWORDS_CHUNKSIZE))
+    except BrokenProcessPool as exc:
+        logging.error("Keyword worker process died, extracting in-process: %s", exc)
+        shutdown_keywords_pool()
+
+        nlp = NaturalLanguageExtractor.instance()
+        return [nlp.extract_keywords(text) for text in texts]
+
+
+def shutdown_keywords_pool():
+    """
+    Stops the worker processes started by extract_keywords_batch, if any.
+    """
+    global _keywords_pool
 
-        # Get only the top 10 least common keywords
-        return keywords_list[:10]
+    with _keywords_pool_lock:
+        if _keywords_pool is not None:
+            _keywords_pool.shutdown()
+            _keywords_pool = None
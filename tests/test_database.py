@@ -1,12 +1,13 @@
 import os
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 from typing import List
 
 import datetime
 
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy import create_engine, event
 
 from custom_exceptions import MissingCredentialsException
 
@@ -17,20 +18,89 @@ def get_time(time_str: str) -> datetime:
 
 class TestDatabase(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        # Build the schema once, every test then runs inside a transaction that is rolled back
+        cls.engine = create_engine('sqlite:///:memory:')
+
+        # pysqlite's own transaction handling breaks SAVEPOINT, let SQLAlchemy emit BEGIN itself
+        @event.listens_for(cls.engine, 'connect')
+        def disable_pysqlite_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(cls.engine, 'begin')
+        def emit_begin(connection):
+            connection.exec_driver_sql('BEGIN')
+
+        Base.metadata.create_all(cls.engine)
+        cls.connection = cls.engine.connect()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.connection.close()
+        cls.engine.dispose()
+
     def setUp(self):
-        self.test_db_path = 'test.db'
-        engine = create_engine(f'sqlite:///{self.test_db_path}')
-        Base.metadata.create_all(engine)
-        Session = sessionmaker(bind=engine)
-        self.session = Session()
+        # Database() reads its path from the environment, keep those in memory as well
+        self.env_patcher = patch.dict(os.environ, {'SQLITE_PATH': ':memory:'})
+        self.env_patcher.start()
+
+        # The session's commits only release savepoints, so the outer rollback undoes them
+        self.trans = self.connection.begin()
+        self.session = Session(bind=self.connection, join_transaction_mode='create_savepoint')
 
     def tearDown(self):
-        os.remove(self.test_db_path)
+        self.session.close()
+        self.trans.rollback()
+        self.env_patcher.stop()
 
-    @patch.dict(os.environ, {'SQLITE_PATH': 'test.db'})
     def test_init(self):
-        db = Database()
-        self.assertEqual(db._path, self.test_db_path)
+        # A directory rather than a single file, since WAL mode adds files next to the database
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test_db_path = os.path.join(tmp_dir, 'test.db')
+
+            with patch.dict(os.environ, {'SQLITE_PATH': test_db_path}):
+                db = Database()
+                db._engine.dispose()
+
+            self.assertEqual(db._path, test_db_path)
+
+    def test_init_sets_pragmas(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with patch.dict(os.environ, {'SQLITE_PATH': os.path.join(tmp_dir, 'test.db')}):
+                db = Database()
+
+            with db._engine.connect() as connection:
+                journal_mode = connection.exec_driver_sql('PRAGMA journal_mode').scalar()
+                synchronous = connection.exec_driver_sql('PRAGMA synchronous').scalar()
+            db._engine.dispose()
+
+        self.assertEqual(journal_mode, 'wal')
+        self.assertEqual(synchronous, 1)
+
+    def test_init_drops_old_indexes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test_db_path = os.path.join(tmp_dir, 'test.db')
+
+            # A database left by a version that indexed entries on (emailed, posted_on_timestamp)
+            old_engine = create_engine(f'sqlite:///{test_db_path}')
+            Base.metadata.create_all(old_engine)
+            with old_engine.begin() as connection:
+                connection.exec_driver_sql(
+                    'CREATE INDEX ix_rss_feed_entry_emailed_posted '
+                    'ON rss_feed_entry (emailed, posted_on_timestamp DESC)')
+            old_engine.dispose()
+
+            with patch.dict(os.environ, {'SQLITE_PATH': test_db_path}):
+                db = Database()
+
+            with db._engine.connect() as connection:
+                index_names = set(connection.exec_driver_sql(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+            db._engine.dispose()
+
+        self.assertNotIn('ix_rss_feed_entry_emailed_posted', index_names)
+        self.assertIn('ix_unemailed', index_names)
 
     def test_init_no_sqlite_path(self):
         with self.assertRaises(MissingCredentialsException):
@@ -45,6 +115,13 @@ class TestDatabase(unittest.TestCase):
             db._commit()
             mock_commit.assert_called_once()
 
+    def test_public_commit(self):
+        with patch.object(self.session, 'commit') as mock_commit:
+            db = Database()
+            db._session = self.session
+            db.commit()
+            mock_commit.assert_called_once()
+
     def test_get_all_feeds(self):
         db = Database()
         db._session = self.session
@@ -75,6 +152,27 @@ class TestDatabase(unittest.TestCase):
         self.assertEqual(len(entries), 1)
         self.assertEqual(entries[0].url, 'https://example.com/rss/entry1')
 
+    def test_get_existing_entry_urls(self):
+        db = Database()
+        db._session = self.session
+        feed = RSSFeed(url='https://example.com/rss')
+        self.session.add(feed)
+        self.session.commit()
+
+        entry = RSSFeedEntry(
+            url='https://example.com/rss/entry1',
+            title='Entry 1',
+            posted_on_timestamp=get_time('2022-01-01 00:00:00'),
+            rss_feed_id=feed.id
+        )
+        self.session.add(entry)
+        self.session.commit()
+
+        urls = db.get_existing_entry_urls(
+            ['https://example.com/rss/entry1', 'https://example.com/rss/entry2'])
+        self.assertEqual(urls, {'https://example.com/rss/entry1'})
+        self.assertEqual(db.get_existing_entry_urls([]), set())
+
     def test_insert_entries(self):
         db = Database()
         db._session = self.session
@@ -101,6 +199,50 @@ class TestDatabase(unittest.TestCase):
         results = self.session.query(RSSFeedEntry).all()
         self.assertEqual(len(results), 2)
 
+    def test_insert_entries_then_update_emailed(self):
+        db = Database()
+        db._session = self.session
+        feed = RSSFeed(url='https://example.com/rss')
+        self.session.add(feed)
+        self.session.commit()
+
+        entry = RSSFeedEntry(
+            url='https://example.com/rss/entry1',
+            title='Entry 1',
+            posted_on_timestamp=get_time('2022-01-01 00:00:00'),
+            rss_feed_id=feed.id
+        )
+        db.insert_entries([entry])
+        self.assertIsNotNone(entry.id)
+
+        db.update_entries_emailed([entry])
+        db.commit()
+
+        updated_entry = self.session.query(RSSFeedEntry).filter(RSSFeedEntry.id == entry.id).one()
+        self.assertEqual(updated_entry.emailed, True)
+
+    @patch('database.INSERT_BATCH_SIZE', 1)
+    def test_insert_entries_batched(self):
+        db = Database()
+        db._session = self.session
+        feed = RSSFeed(url='https://example.com/rss')
+        self.session.add(feed)
+        self.session.commit()
+
+        entries = [
+            RSSFeedEntry(
+                url=f'https://example.com/rss/entry{i}',
+                title=f'Entry {i}',
+                posted_on_timestamp=get_time('2022-01-01 00:00:00'),
+                rss_feed_id=feed.id
+            ) for i in range(3)
+        ]
+        db.insert_entries(entries)
+
+        results = self.session.query(RSSFeedEntry).all()
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(result.emailed is False for result in results))
+
     def test_update_entries_emailed(self):
         db = Database()
         db._session = self.session
@@ -119,10 +261,66 @@ class TestDatabase(unittest.TestCase):
         self.session.commit()
 
         db.update_entries_emailed([entry])
+        db.commit()
 
         updated_entry = self.session.query(RSSFeedEntry).filter(RSSFeedEntry.id == entry.id).one()
         self.assertEqual(updated_entry.emailed, True)
 
+    def test_expunge_entries(self):
+        db = Database()
+        db._session = self.session
+        feed = RSSFeed(url='https://example.com/rss')
+        self.session.add(feed)
+        self.session.commit()
+
+        entry = RSSFeedEntry(
+            url='https://example.com/rss/entry1',
+            title='Entry 1',
+            posted_on_timestamp=get_time('2022-01-01 00:00:00'),
+            rss_feed_id=feed.id
+        )
+        db.insert_entries([entry])
+
+        db.expunge_entries([entry])
+
+        self.assertNotIn(entry, self.session)
+        self.assertIn(feed, self.session)
+
+    def test_get_unemailed_entries(self):
+        db = Database()
+        db._session = self.session
+        feed = RSSFeed(url='https://example.com/rss')
+        self.session.add(feed)
+        self.session.commit()
+
+        self.session.add_all([
+            RSSFeedEntry(
+                url='https://example.com/rss/entry1',
+                title='Entry 1',
+                posted_on_timestamp=get_time('2022-01-01 00:00:00'),
+                emailed=False,
+                rss_feed_id=feed.id
+            ),
+            RSSFeedEntry(
+                url='https://example.com/rss/entry2',
+                title='Entry 2',
+                posted_on_timestamp=get_time('2022-01-02 00:00:00'),
+                emailed=True,
+                rss_feed_id=feed.id
+            ),
+            RSSFeedEntry(
+                url='https://example.com/rss/entry3',
+                title='Entry 3',
+                posted_on_timestamp=get_time('2022-01-03 00:00:00'),
+                emailed=False,
+                rss_feed_id=feed.id
+            ),
+        ])
+        self.session.commit()
+
+        entries = db.get_unemailed_entries()
+        self.assertEqual([entry.title for entry in entries], ['Entry 3', 'Entry 1'])
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -1,5 +1,6 @@
 import unittest
 from unittest.mock import MagicMock, patch
+from smtplib import SMTPServerDisconnected
 
 from email_handler import EmailAccount, Email, validate_email
 from custom_exceptions import MissingCredentialsException, InvalidSMTPLoginException
@@ -73,20 +74,65 @@ class TestEmail(unittest.TestCase):
         with self.assertRaises(InvalidSMTPAddressException):
             Email(self.email_account, "jane.doe@123", self.subject, self.body)
 
+    @patch.dict('os.environ', {
+        'EMAIL_SERVER': 'smtp.gmail.com',
+        'EMAIL_PORT': '587',
+        'EMAIL_USERNAME': 'john.doe@example.com',
+        'EMAIL_PASSWORD': 'password123'
+    })
     @patch('smtplib.SMTP')
     def test_send(self, mock_smtp):
-        email = Email(self.email_account, self.to_address, self.subject, self.body)
+        email_account = EmailAccount()
+        email = Email(email_account, self.to_address, self.subject, self.body)
 
-        mock_smtp_instance = mock_smtp.return_value.__enter__.return_value
+        mock_smtp_instance = mock_smtp.return_value
 
         email.send()
 
-        mock_smtp.assert_called_once_with(self.email_account.server, self.email_account.port)
+        mock_smtp.assert_called_once_with(email_account.server, email_account.port)
         mock_smtp_instance.starttls.assert_called_once()
         mock_smtp_instance.login.assert_called_once_with(
-            self.email_account.from_address, self.email_account.password)
+            email_account.from_address, email_account.password)
         mock_smtp_instance.send_message.assert_called_once()
 
+    @patch.dict('os.environ', {
+        'EMAIL_SERVER': 'smtp.gmail.com',
+        'EMAIL_PORT': '587',
+        'EMAIL_USERNAME': 'john.doe@example.com',
+        'EMAIL_PASSWORD': 'password123'
+    })
+    @patch('smtplib.SMTP')
+    def test_send_reuses_connection(self, mock_smtp):
+        email_account = EmailAccount()
+
+        mock_smtp_instance = mock_smtp.return_value
+        mock_smtp_instance.noop.return_value = (250, b'OK')
+
+        Email(email_account, self.to_address, self.subject, self.body).send()
+        Email(email_account, self.to_address, self.subject, self.body).send()
+
+        mock_smtp.assert_called_once()
+        mock_smtp_instance.login.assert_called_once()
+        self.assertEqual(mock_smtp_instance.send_message.call_count, 2)
+
+    @patch.dict('os.environ', {
+        'EMAIL_SERVER': 'smtp.gmail.com',
+        'EMAIL_PORT': '587',
+        'EMAIL_USERNAME': 'john.doe@example.com',
+        'EMAIL_PASSWORD': 'password123'
+    })
+    @patch('smtplib.SMTP')
+    def test_send_reconnects_on_disconnect(self, mock_smtp):
+        email_account = EmailAccount()
+
+        mock_smtp_instance = mock_smtp.return_value
+        mock_smtp_instance.noop.side_effect = SMTPServerDisconnected()
+
+        Email(email_account, self.to_address, self.subject, self.body).send()
+        Email(email_account, self.to_address, self.subject, self.body).send()
+
+        self.assertEqual(mock_smtp.call_count, 2)
+        self.assertEqual(mock_smtp_instance.send_message.call_count, 2)
 
 
 if __name__ == '__main__':
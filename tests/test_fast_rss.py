@@ -0,0 +1,60 @@
+import unittest
+
+import fast_rss
+from custom_exceptions import RSSFeedException
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+<channel>
+<title>All jobs | upwork.com</title>
+<item>
+<title><![CDATA[Python scraper - Upwork]]></title>
+<link>https://www.upwork.com/jobs/Python-scraper_%7E01?source=rss</link>
+<description><![CDATA[Build a scraper.<br /><b>Skills</b>:Python,     Web Scraping
+<br />
+]]></description>
+<pubDate>Wed, 14 Oct 2026 01:05:00 +0000</pubDate>
+</item>
+<item>
+<title>React dashboard - Upwork</title>
+<link>https://www.upwork.com/jobs/React-dashboard_%7E02?source=rss</link>
+<description>Build a dashboard.&lt;br /&gt;</description>
+</item>
+</channel>
+</rss>
+"""
+
+
+class TestParse(unittest.TestCase):
+
+    def test_parse_bytes(self):
+        entries = fast_rss.parse(FEED)
+
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0]['title'], 'Python scraper - Upwork')
+        self.assertEqual(entries[0]['link'],
+                         'https://www.upwork.com/jobs/Python-scraper_%7E01?source=rss')
+        self.assertEqual(entries[0]['summary'],
+                         'Build a scraper.<br /><b>Skills</b>:Python,     Web Scraping\n<br />')
+        self.assertEqual(entries[0]['published'], 'Wed, 14 Oct 2026 01:05:00 +0000')
+
+    def test_parse_escaped_description(self):
+        entries = fast_rss.parse(FEED)
+
+        self.assertEqual(entries[1]['summary'], 'Build a dashboard.<br />')
+        self.assertEqual(entries[1]['published'], '')
+
+    def test_parse_str(self):
+        self.assertEqual(fast_rss.parse(FEED.decode('utf-8')), fast_rss.parse(FEED))
+
+    def test_malformed_xml(self):
+        with self.assertRaises(RSSFeedException):
+            fast_rss.parse(b'<rss><channel>')
+
+    def test_not_rss(self):
+        with self.assertRaises(RSSFeedException):
+            fast_rss.parse(b'<feed xmlns="http://www.w3.org/2005/Atom"></feed>')
+
+
+if __name__ == '__main__':
+    unittest.main()
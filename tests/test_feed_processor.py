@@ -0,0 +1,160 @@
+import os
+import unittest
+from unittest.mock import patch, AsyncMock
+
+import datetime
+
+from database import Database, RSSFeedEntry
+from feed_processor import FeedManager
+
+FEED_URL = 'https://www.upwork.com/ab/feed/jobs/rss?q=python'
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+<channel>
+<title>All jobs | upwork.com</title>
+<item>
+<title><![CDATA[Python scraper - Upwork]]></title>
+<link>https://www.upwork.com/jobs/Python-scraper_%7E01?source=rss</link>
+<description><![CDATA[Build a scraper.<br /><b>Hourly Range</b>: $25.00-$50.00
+<br /><b>Posted On</b>: October 14, 2026 01:05 UTC<br /><b>Skills</b>:Python,     Web Scraping
+<br />]]></description>
+</item>
+<item>
+<title><![CDATA[React dashboard - Upwork]]></title>
+<link>https://www.upwork.com/jobs/React-dashboard_%7E02?source=rss</link>
+<description><![CDATA[Build a dashboard.<br /><b>Posted On</b>: October 13, 2026 22:40 UTC<br />]]></description>
+</item>
+</channel>
+</rss>
+"""
+
+
+class StopLoop(Exception):
+    """
+    Raised by the patched asyncio.sleep to end run_feed_loop after its iterations.
+    """
+
+
+def stop_after(iterations: int) -> AsyncMock:
+    return AsyncMock(side_effect=[None] * (iterations - 1) + [StopLoop()])
+
+
+class TestFeedManager(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        env_patcher = patch.dict(os.environ, {
+            'SQLITE_PATH': ':memory:',
+            'EMAIL_SERVER': 'smtp.gmail.com',
+            'EMAIL_PORT': '587',
+            'EMAIL_USERNAME': 'john.doe@example.com',
+            'EMAIL_PASSWORD': 'password123'
+        })
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+
+        smtp_patcher = patch('email_handler.smtplib.SMTP')
+        self.mock_smtp = smtp_patcher.start()
+        self.addCleanup(smtp_patcher.stop)
+
+        self.mock_smtp.return_value.noop.return_value = (250, b'OK')
+
+        self.db = Database()
+        self.feed_manager = FeedManager(self.db, 'jane.doe@example.com', wait_seconds=60)
+        self.feed_manager._fetch_entries_http = AsyncMock(return_value=FEED)
+
+    async def asyncTearDown(self):
+        await self.feed_manager.close()
+        self.db._session.close()
+        self.db._engine.dispose()
+
+    def get_emailed_flags(self) -> dict:
+        with self.db._engine.connect() as connection:
+            rows = connection.exec_driver_sql('SELECT url, emailed FROM rss_feed_entry').all()
+
+        return dict(rows)
+
+    async def test_only_due_feeds_are_checked(self):
+        now_utc = datetime.datetime.utcnow()
+
+        waiting_feed = self.db.add_feed('https://www.upwork.com/ab/feed/jobs/rss?q=react')
+        waiting_feed.last_checked_timestamp = now_utc - datetime.timedelta(seconds=30)
+        due_feed = self.db.add_feed(FEED_URL)
+        due_feed.last_checked_timestamp = now_utc - datetime.timedelta(seconds=120)
+        self.db.commit()
+
+        self.feed_manager._load_existing_feeds()
+
+        with patch('feed_processor.asyncio.sleep', stop_after(1)) as mock_sleep:
+            with self.assertRaises(StopLoop):
+                await self.feed_manager.run_feed_loop()
+
+        self.feed_manager._fetch_entries_http.assert_awaited_once_with(FEED_URL)
+
+        # The checked feed goes back in line a full wait after now, behind the waiting one
+        schedule = sorted(self.feed_manager._feed_schedule)
+        self.assertEqual([feed for _, _, feed in schedule], [waiting_feed, due_feed])
+        self.assertGreaterEqual(schedule[1][0], now_utc + datetime.timedelta(seconds=60))
+
+        # Sleeps until the waiting feed is due, about 30 seconds from now
+        wait_time = mock_sleep.await_args.args[0]
+        self.assertGreater(wait_time, 0)
+        self.assertLessEqual(wait_time, 30)
+
+    async def test_entries_are_emailed_once(self):
+        feed = self.db.add_feed('https://www.upwork.com/ab/feed/jobs/rss?q=react')
+
+        # Left unemailed when the scraper last stopped
+        self.db._session.add(RSSFeedEntry(
+            url='https://www.upwork.com/jobs/Leftover_%7E00?source=rss', title='Leftover',
+            posted_on_timestamp=datetime.datetime(2026, 10, 13, 12, 0), keywords='',
+            rss_feed_id=feed.id))
+        self.db.commit()
+
+        await self.feed_manager.add_new_feed(FEED_URL)
+
+        with patch('feed_processor.asyncio.sleep', stop_after(2)):
+            with self.assertRaises(StopLoop):
+                await self.feed_manager.run_feed_loop()
+
+        server = self.mock_smtp.return_value
+        server.send_message.assert_called_once()
+        self.assertEqual(server.send_message.call_args.args[0]['Subject'],
+                         'Upwork RSS Feed Update (3)')
+
+        self.assertEqual(self.get_emailed_flags(), {
+            'https://www.upwork.com/jobs/Leftover_%7E00?source=rss': 1,
+            'https://www.upwork.com/jobs/Python-scraper_%7E01?source=rss': 1,
+            'https://www.upwork.com/jobs/React-dashboard_%7E02?source=rss': 1,
+        })
+
+    async def test_new_entries_are_stored_naive_utc(self):
+        await self.feed_manager.add_new_feed(FEED_URL)
+
+        entries = {entry.title: entry for entry in self.feed_manager._unemailed_entries}
+
+        self.assertEqual(entries['Python scraper'].posted_on_timestamp,
+                         datetime.datetime(2026, 10, 14, 1, 5))
+        self.assertIsNone(entries['Python scraper'].posted_on_timestamp.tzinfo)
+        self.assertEqual(entries['Python scraper'].low_hourly, '$25.00')
+        self.assertEqual(entries['Python scraper'].skills, 'Python, Web Scraping')
+
+    def test_get_time_ago_string(self):
+        expected = {
+            -5: 'just now',
+            0: 'just now',
+            1: '1 minute ago',
+            59: '59 minutes ago',
+            60: '1 hour ago',
+            1439: '23 hours ago',
+            1440: '1 day ago',
+            2880: '2 days ago',
+        }
+
+        for minutes_ago, time_ago in expected.items():
+            with self.subTest(minutes_ago=minutes_ago):
+                self.assertEqual(self.feed_manager._get_time_ago_string(minutes_ago), time_ago)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,255 @@
+import os
+import pickle
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+
+import datetime
+
+from language_processor import get_hourly_range, get_skills, get_posted_on_timestamp
+from language_processor import parse_summary, parse_summaries
+from language_processor import clean_html_text, NaturalLanguageExtractor, _load_brown_freq
+from language_processor import extract_keywords_batch, shutdown_keywords_pool
+
+SUMMARY = (
+    'We need a Python developer. See https://example.com/spec for details.<br /><br />'
+    '<b>Hourly Range</b>: $25.00-$50.00\n\n'
+    '<br /><b>Posted On</b>: October 14, 2026 01:05 UTC<br />'
+    '<b>Category</b>: Scripts &amp; Utilities<br />'
+    '<b>Skills</b>:Python,     Web Scraping,     Data Mining\n'
+    '<br /><b>Country</b>: United States\n'
+)
+
+FIXED_PRICE_SUMMARY = (
+    'Build a dashboard.<br /><br /><b>Budget</b>: $500\n'
+    '<br /><b>Country</b>: Canada\n'
+)
+
+
+class TestSummaryExtraction(unittest.TestCase):
+
+    def test_get_hourly_range(self):
+        self.assertEqual(get_hourly_range(SUMMARY), ('$25.00', '$50.00'))
+
+    def test_get_hourly_range_missing(self):
+        self.assertEqual(get_hourly_range(FIXED_PRICE_SUMMARY), (None, None))
+
+    def test_get_skills(self):
+        self.assertEqual(get_skills(SUMMARY), 'Python, Web Scraping, Data Mining')
+
+    def test_get_skills_missing(self):
+        self.assertIsNone(get_skills(FIXED_PRICE_SUMMARY))
+
+    def test_get_posted_on_timestamp(self):
+        timestamp = get_posted_on_timestamp(SUMMARY)
+
+        self.assertEqual(timestamp.replace(tzinfo=None), datetime.datetime(2026, 10, 14, 1, 5))
+        self.assertEqual(timestamp.utcoffset(), datetime.timedelta(0))
+
+    def test_get_posted_on_timestamp_matches_strptime(self):
+        summary = SUMMARY.replace('October 14, 2026 01:05', 'March 3, 2026 23:59')
+        expected = datetime.datetime.strptime('March 3, 2026 23:59', '%B %d, %Y %H:%M')
+
+        self.assertEqual(get_posted_on_timestamp(summary).replace(tzinfo=None), expected)
+
+    def test_get_posted_on_timestamp_invalid(self):
+        with self.assertRaises(ValueError):
+            get_posted_on_timestamp(SUMMARY.replace('October 14, 2026', 'Octob 14, 2026'))
+
+    def test_get_posted_on_timestamp_rejects_what_strptime_rejects(self):
+        for date in ('October 14 2026 01:05', 'October ١٤, 2026 01:05',
+                     'October 014, 2026 01:05', 'October 14, 2026 +1:05'):
+            with self.subTest(date=date):
+                with self.assertRaises(ValueError):
+                    get_posted_on_timestamp(SUMMARY.replace('October 14, 2026 01:05', date))
+
+    def test_get_posted_on_timestamp_missing(self):
+        self.assertIsNone(get_posted_on_timestamp(FIXED_PRICE_SUMMARY))
+
+    def test_parse_summary(self):
+        parsed = parse_summary(SUMMARY)
+
+        self.assertEqual(parsed['low_hourly'], '$25.00')
+        self.assertEqual(parsed['high_hourly'], '$50.00')
+        self.assertEqual(parsed['skills'], get_skills(SUMMARY))
+        self.assertEqual(parsed['posted_on_timestamp'], get_posted_on_timestamp(SUMMARY))
+
+    def test_parse_summary_field_inside_unterminated_skills(self):
+        summary = '<b>Skills</b>:Python\n<b>Posted On</b>: March 3, 2026 23:59 UTC<br />'
+
+        parsed = parse_summary(summary)
+
+        self.assertEqual(parsed['posted_on_timestamp'], get_posted_on_timestamp(summary))
+        self.assertEqual(parsed['posted_on_timestamp'].replace(tzinfo=None),
+                         datetime.datetime(2026, 3, 3, 23, 59))
+        self.assertEqual(parsed['skills'], get_skills(summary))
+
+    def test_parse_summary_missing_fields(self):
+        parsed = parse_summary(FIXED_PRICE_SUMMARY)
+
+        self.assertEqual(parsed, {'low_hourly': None, 'high_hourly': None,
+                                  'skills': None, 'posted_on_timestamp': None})
+
+    def test_parse_summaries(self):
+        unterminated = '<b>Skills</b>:Python\n<b>Posted On</b>: March 3, 2026 23:59 UTC<br />'
+        summaries = [SUMMARY, FIXED_PRICE_SUMMARY, '', unterminated, SUMMARY]
+
+        # Compared with the standalone helpers, each of which searches for its field alone
+        expected = [{
+            'low_hourly': get_hourly_range(summary)[0],
+            'high_hourly': get_hourly_range(summary)[1],
+            'skills': get_skills(summary),
+            'posted_on_timestamp': get_posted_on_timestamp(summary)
+        } for summary in summaries]
+
+        self.assertEqual(parse_summaries(summaries), expected)
+        self.assertIsNotNone(parse_summaries([unterminated])[0]['posted_on_timestamp'])
+
+    def test_parse_summaries_does_not_cross_entries(self):
+        unterminated = 'Build a dashboard.<br /><b>Skills</b>:React <b>Posted On</b>: soon'
+
+        parsed = parse_summaries([unterminated, SUMMARY])
+
+        self.assertIsNone(parsed[0]['skills'])
+        self.assertIsNone(parsed[0]['posted_on_timestamp'])
+        self.assertEqual(parsed[1]['skills'], get_skills(SUMMARY))
+        self.assertEqual(parsed[1]['posted_on_timestamp'], get_posted_on_timestamp(SUMMARY))
+
+    def test_parse_summaries_empty(self):
+        self.assertEqual(parse_summaries([]), [])
+
+
+class TestCleanHtmlText(unittest.TestCase):
+
+    def test_strips_tags(self):
+        self.assertEqual(clean_html_text('<p>Python</p><p>Django</p>'), 'Python Django')
+
+    def test_unescapes_entities(self):
+        self.assertEqual(clean_html_text('Scripts &amp; Utilities'), 'Scripts & Utilities')
+
+    def test_keeps_bare_angle_brackets(self):
+        self.assertEqual(clean_html_text('<b>Rate</b> a < b > c'), 'Rate  a < b > c')
+
+    def test_quoted_angle_bracket_in_attribute(self):
+        self.assertEqual(clean_html_text('<a href="x>y">link</a> text'), 'link  text')
+
+    def test_keeps_cdata_text(self):
+        self.assertEqual(clean_html_text('a<![CDATA[raw <b>x</b> &amp;]]>b'), 'a raw <b>x</b> &amp; b')
+
+    def test_drops_comments(self):
+        self.assertEqual(clean_html_text('<p>x</p><!-- c > d -->e'), 'x e')
+
+    def test_collapses_whitespace_only_pieces(self):
+        self.assertEqual(clean_html_text('<p>a</p>\n\n<p>b</p>'), 'a \n b')
+
+    def test_plain_text(self):
+        self.assertEqual(clean_html_text('React dashboard'), 'React dashboard')
+
+
+class TestNaturalLanguageExtractorHelpers(unittest.TestCase):
+
+    def test_remove_non_letters(self):
+        self.assertEqual(NaturalLanguageExtractor._remove_non_letters('node.js2'), 'nodejs')
+        self.assertEqual(NaturalLanguageExtractor._remove_non_letters('python'), 'python')
+        self.assertEqual(NaturalLanguageExtractor._remove_non_letters('café'), 'caf')
+
+    def test_remove_urls(self):
+        text = NaturalLanguageExtractor._remove_urls('See https://example.com/spec and www.example.com')
+
+        self.assertNotIn('example.com', text)
+        self.assertIn('See', text)
+
+    def test_remove_urls_after_punctuation(self):
+        remove_urls = NaturalLanguageExtractor._remove_urls
+
+        self.assertEqual(remove_urls('Portfolio (https://github.com/acme/app) required'),
+                         'Portfolio ( required')
+        self.assertEqual(remove_urls('Spec:https://docs.google.com/doc here'), 'Spec: here')
+        self.assertNotIn('acme', remove_urls('See "www.acme.io"'))
+
+
+
+class TestLoadBrownFreq(unittest.TestCase):
+
+    def setUp(self):
+        _load_brown_freq.cache_clear()
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.cache_dir.name, 'brown_fdist.pkl')
+
+    def tearDown(self):
+        _load_brown_freq.cache_clear()
+        self.cache_dir.cleanup()
+
+    def test_loads_cached_frequencies(self):
+        with open(self.cache_path, 'wb') as cache_file:
+            pickle.dump({'python': 3}, cache_file)
+
+        with patch('language_processor._BROWN_FREQ_CACHE_PATH', self.cache_path):
+            freq = _load_brown_freq()
+
+            self.assertEqual(freq, {'python': 3})
+            self.assertIs(_load_brown_freq(), freq)
+
+    def test_counts_and_caches_corpus(self):
+        brown = MagicMock()
+        brown.words.return_value = ['the'] * 20 + ['python'] * 3
+
+        with patch('language_processor._BROWN_FREQ_CACHE_PATH', self.cache_path), \
+                patch('nltk.corpus.brown', brown):
+            freq = _load_brown_freq()
+
+        self.assertEqual(freq, {'the': 20, 'python': 3})
+        self.assertTrue(os.path.exists(self.cache_path))
+
+
+class TestExtractKeywordsBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.nlp = MagicMock()
+        self.nlp.extract_keywords.side_effect = lambda text: [text.upper()]
+
+        instance_patcher = patch.object(NaturalLanguageExtractor, 'instance', return_value=self.nlp)
+        instance_patcher.start()
+        self.addCleanup(instance_patcher.stop)
+
+    def tearDown(self):
+        shutdown_keywords_pool()
+
+    def test_small_batch_in_process(self):
+        with patch('language_processor.ProcessPoolExecutor') as mock_pool:
+            keywords = extract_keywords_batch(['python', 'react'])
+
+        self.assertEqual(keywords, [['PYTHON'], ['REACT']])
+        mock_pool.assert_not_called()
+
+    @patch('language_processor._MIN_PARALLEL_BATCH', 2)
+    @patch('language_processor.os.cpu_count', return_value=4)
+    @patch('language_processor._load_brown_freq')
+    def test_large_batch_uses_pool(self, mock_load_brown_freq, mock_cpu_count):
+        texts = [f'skill{i}' for i in range(40)]
+
+        # Threads stand in for the worker processes, the patched extractor isn't visible to those
+        def make_pool(max_workers, initializer, mp_context):
+            return ThreadPoolExecutor(max_workers=max_workers, initializer=initializer)
+
+        with patch('language_processor.ProcessPoolExecutor', side_effect=make_pool) as mock_pool:
+            keywords = extract_keywords_batch(texts)
+
+        self.assertEqual(keywords, [[text.upper()] for text in texts])
+        mock_load_brown_freq.assert_called_once()
+        self.assertEqual(mock_pool.call_args.kwargs['mp_context'].get_start_method(), 'forkserver')
+
+    @patch('language_processor._MIN_PARALLEL_BATCH', 2)
+    @patch('language_processor.os.cpu_count', return_value=4)
+    @patch('language_processor.multiprocessing.get_context', side_effect=ValueError)
+    def test_in_process_without_forkserver(self, mock_get_context, mock_cpu_count):
+        with patch('language_processor.ProcessPoolExecutor') as mock_pool:
+            keywords = extract_keywords_batch(['python', 'react'])
+
+        self.assertEqual(keywords, [['PYTHON'], ['REACT']])
+        mock_pool.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()